@@ -1,9 +1,12 @@
 # spaceship_titanic_analysis.py
 
-import csv
+import shutil
+
 import pandas as pd
 import matplotlib.pyplot as plt
 
+COPY_BUFFER_SIZE = 1 << 20  # 1 MiB
+
 
 class TitanicMerger:
     """train.csv와 test.csv를 합쳐서 data.csv 생성"""
@@ -14,33 +17,49 @@ class TitanicMerger:
         self.output_path = 'data.csv'
 
     def merge_files(self):
-        with open(self.output_path, 'w', newline='', encoding='utf-8') as out_file:
-            writer = csv.writer(out_file)
-            first_file = True
-
-            for file_path in [self.train_path, self.test_path]:
-                with open(file_path, 'r', encoding='utf-8') as in_file:
-                    reader = csv.reader(in_file)
-                    header = next(reader)
-
-                    if first_file:
-                        writer.writerow(header)
-                        first_file = False
-
-                    for row in reader:
-                        writer.writerow(row)
+        # 행 단위 파싱 없이 바이트 그대로 복사 (두 번째 파일은 헤더만 건너뜀)
+        with open(self.train_path, 'rb') as train_file, \
+                open(self.test_path, 'rb') as test_file:
+            train_header = train_file.readline()
+            test_header = test_file.readline()
+
+            # test.csv 열은 train.csv 열의 앞부분과 같아야 함 (Transported 없음)
+            train_columns = train_header.rstrip(b'\r\n').split(b',')
+            test_columns = test_header.rstrip(b'\r\n').split(b',')
+            if train_columns[:len(test_columns)] != test_columns:
+                raise ValueError(
+                    f'{self.test_path} 헤더가 {self.train_path} 헤더와 일치하지 않습니다: '
+                    f'{test_header!r} vs {train_header!r}'
+                )
+
+            with open(self.output_path, 'wb') as out_file:
+                out_file.write(train_header)
+                shutil.copyfileobj(train_file, out_file, COPY_BUFFER_SIZE)
+                if train_file.tell() > 0:
+                    train_file.seek(-1, 2)
+                    if train_file.read(1) != b'\n':
+                        out_file.write(b'\n')
+
+                shutil.copyfileobj(test_file, out_file, COPY_BUFFER_SIZE)
 
 class TitanicAnalyzer:
     """Spaceship Titanic 데이터 분석 및 시각화"""
     def __init__(self, data_path):
-        self.df = pd.read_csv(data_path, sep=',', encoding='utf-8')
+        self.df = pd.read_csv(
+            data_path,
+            sep=',',
+            encoding='utf-8',
+            dtype={'Transported': 'boolean', 'Age': 'Float32'},
+        )
 
         # Transported Boolean -> 숫자형 변환
-        self.df['Transported'] = self.df['Transported'].map({True: 1, False: 0})
+        self.df['Transported'] = self.df['Transported'].astype('Int8')
+
+        # 나이대(10살 단위) 컬럼은 한 번만 계산
+        self.df['AgeGroup'] = (self.df['Age'] // 10) * 10
 
     def plot_age_transport(self):
         """나이대별 Transported 비율 막대그래프"""
-        self.df['AgeGroup'] = (self.df['Age'] // 10) * 10
         age_transport = self.df.groupby('AgeGroup')['Transported'].mean()
         age_transport.plot(kind='bar', color='skyblue')
         plt.title('Age Group vs Transported')
@@ -51,12 +70,17 @@ class TitanicAnalyzer:
 
     def plot_destination_age_distribution(self):
         """Destination별 나이대 분포 시각화"""
-        self.df['AgeGroup'] = (self.df['Age'] // 10) * 10
-        destinations = self.df['Destination'].dropna().unique()
-
-        for dest in destinations:
-            subset = self.df[self.df['Destination'] == dest]
-            age_counts = subset['AgeGroup'].value_counts().sort_index()
+        counts = (
+            self.df.dropna(subset=['Destination'])
+            .groupby(['Destination', 'AgeGroup'])
+            .size()
+            .unstack(fill_value=0)
+        )
+
+        # 목적지는 등장 순서대로, 해당 목적지에 없는 나이대는 제외
+        for dest in self.df['Destination'].dropna().unique():
+            age_counts = counts.loc[dest]
+            age_counts = age_counts[age_counts > 0]
             age_counts.plot(kind='bar', alpha=0.6)
             plt.title(f'Age Distribution for Destination {dest}')
             plt.xlabel('Age Group')
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import os
 import textwrap
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
+from pyarrow import csv as pacsv
 
 BASE_DIR = Path(__file__).parent
 DATA_PATH = BASE_DIR / "gender_list.csv"
@@ -14,13 +18,41 @@ OUTPUT_GENDER_AGE_CSV = BASE_DIR / "general_households_by_gender_age.csv"
 OUTPUT_FIGURE = BASE_DIR / "gender_age_line.png"
 OUTPUT_REPORT = BASE_DIR / "general_household_trend_report.txt"
 
+VERBOSE = os.environ.get("CODYSSEY_VERBOSE", "0") == "1"
+PREVIEW_ROWS = 10
+
+# Subtotal rows that overlap the individual age brackets.
+EXCLUDED_AGE_GROUPS = frozenset({"합계", "15~64세", "65세이상"})
+
+
+def _dedupe_column_names(names: list[str]) -> list[str]:
+    """
+    Suffix repeated header names as pandas does ("2024", "2024.1", ...) so
+    each year/metric column keeps a unique label.
+    """
+    seen: dict[str, int] = {}
+    unique_names = []
+    for name in names:
+        count = seen.get(name, 0)
+        unique_names.append(name if count == 0 else f"{name}.{count}")
+        seen[name] = count + 1
+    return unique_names
+
 
 def load_long_form_dataframe(csv_path: Path) -> pd.DataFrame:
     """
     Read the source CSV, replace sentinel values, and expand the repeated
-    year/metric columns into a tidy long-form dataframe.
+    year/metric columns into a tidy long-form dataframe. Suppressed cells
+    are kept with a NaN 값.
     """
-    df_raw = pd.read_csv(csv_path, encoding="cp949")
+    table = pacsv.read_csv(
+        csv_path,
+        read_options=pacsv.ReadOptions(encoding="cp949"),
+        # Keep blank cells missing, as pd.read_csv did.
+        convert_options=pacsv.ConvertOptions(strings_can_be_null=True),
+    )
+    table = table.rename_columns(_dedupe_column_names(table.column_names))
+    df_raw = table.to_pandas(types_mapper=pd.ArrowDtype)
     df_raw = df_raw.rename(
         columns={
             df_raw.columns[0]: "행정구역",
@@ -30,32 +62,29 @@ def load_long_form_dataframe(csv_path: Path) -> pd.DataFrame:
     )
 
     header_row = df_raw.iloc[0]
-    data_rows = df_raw.iloc[1:].copy()
+    data_rows = df_raw.iloc[1:]
     data_rows = data_rows.replace({"X": pd.NA, "-": pd.NA})
 
-    long_frames = []
-    for column in data_rows.columns[3:]:
-        year = int(column.split(".")[0])
-        metric_name = header_row[column]
-        values = pd.to_numeric(data_rows[column], errors="coerce")
-        long_frames.append(
-            pd.DataFrame(
-                {
-                    "행정구역": data_rows["행정구역"],
-                    "성별": data_rows["성별"],
-                    "연령별": data_rows["연령별"],
-                    "연도": year,
-                    "지표": metric_name,
-                    "값": values,
-                }
-            )
-        )
-
-    tidy_df = (
-        pd.concat(long_frames, ignore_index=True)
-        .dropna(subset=["값"])
-        .astype({"연도": "int64"})
+    value_columns = np.asarray(data_rows.columns[3:])
+    years = np.array(
+        [int(column.split(".", 1)[0]) for column in value_columns], dtype=np.int64
+    )
+    metrics = header_row.iloc[3:].to_numpy()
+    year_map = dict(zip(value_columns, years))
+    metric_map = dict(zip(value_columns, metrics))
+
+    tidy_df = data_rows.melt(
+        id_vars=["행정구역", "성별", "연령별"],
+        value_vars=list(value_columns),
+        var_name="__col",
+        value_name="값",
     )
+    tidy_df["연도"] = tidy_df["__col"].map(year_map).astype("int64")
+    tidy_df["지표"] = tidy_df["__col"].map(metric_map)
+    tidy_df["값"] = pd.to_numeric(tidy_df["값"], errors="coerce").astype("float64")
+    tidy_df = tidy_df[["행정구역", "성별", "연령별", "연도", "지표", "값"]]
+    for column in ("행정구역", "성별", "연령별", "지표"):
+        tidy_df[column] = tidy_df[column].astype("category")
     return tidy_df
 
 
@@ -63,48 +92,62 @@ def aggregate_general_households(
     long_df: pd.DataFrame,
 ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     indicator_mask = long_df["지표"] == "일반가구원"
-    filtered = long_df[indicator_mask & (long_df["연도"] >= 2015)].copy()
-    age_order = (
-        filtered.loc[filtered["성별"] == "계", "연령별"]
-        .drop_duplicates()
-        .tolist()
+    # Suppressed cells stay NaN in the tidy frame; drop them only for the rows we sum.
+    filtered = long_df.loc[
+        indicator_mask & (long_df["연도"] >= 2015) & long_df["값"].notna()
+    ]
+    base = filtered.groupby(
+        ["연도", "성별", "연령별"], as_index=False, sort=False, observed=True
+    )["값"].sum()
+    age_order = base.loc[base["성별"] == "계", "연령별"].drop_duplicates().tolist()
+    base = base.assign(
+        연령별=pd.Categorical(base["연령별"], categories=age_order, ordered=True)
     )
+    gender_rows = base[base["성별"].isin(["남자", "여자"])]
 
     gender_year = (
-        filtered[
-            (filtered["성별"].isin(["남자", "여자"])) & (filtered["연령별"] == "합계")
-        ]
-        .groupby(["연도", "성별"], as_index=False)["값"]
+        gender_rows[gender_rows["연령별"] == "합계"]
+        .groupby(["연도", "성별"], as_index=False, observed=True)["값"]
         .sum()
         .sort_values(["연도", "성별"])
     )
     age_totals = (
-        filtered[filtered["성별"] == "계"]
-        .groupby(["연도", "연령별"], as_index=False)["값"]
-        .sum()
-    )
-    age_totals["연령별"] = pd.Categorical(
-        age_totals["연령별"], categories=age_order, ordered=True
-    )
-    age_totals = age_totals.sort_values(["연도", "연령별"])
-
-    gender_age = (
-        filtered[filtered["성별"].isin(["남자", "여자"])]
-        .groupby(["연도", "성별", "연령별"], as_index=False)["값"]
-        .sum()
-    )
-    gender_age["연령별"] = pd.Categorical(
-        gender_age["연령별"], categories=age_order, ordered=True
+        base[base["성별"] == "계"]
+        .drop(columns="성별")
+        .sort_values(["연도", "연령별"])
     )
-    gender_age = gender_age.sort_values(["연도", "성별", "연령별"])
+    gender_age = gender_rows.sort_values(["연도", "성별", "연령별"])
 
     return gender_year, age_totals, gender_age
 
 
+def format_table(df: pd.DataFrame) -> str:
+    """
+    Render every row when CODYSSEY_VERBOSE=1; otherwise only a short preview
+    plus the row count, since the full tables are already saved as CSV.
+    """
+    if VERBOSE:
+        return df.to_string(index=False)
+    return f"{df.head(PREVIEW_ROWS).to_string(index=False)}\n(총 {len(df)}행)"
+
+
 def save_csv(df: pd.DataFrame, path: Path) -> None:
     df.to_csv(path, index=False, encoding="utf-8-sig")
 
 
+def _not_excluded_age_mask(ages: pd.Series) -> np.ndarray:
+    """
+    Flag rows whose categorical 연령별 is not a subtotal by comparing the
+    integer category codes instead of probing the labels one by one.
+    """
+    categories = ages.cat.categories
+    excluded_codes = np.asarray(
+        [categories.get_loc(age) for age in EXCLUDED_AGE_GROUPS if age in categories],
+        dtype=np.int64,
+    )
+    return ~np.isin(ages.cat.codes.to_numpy(), excluded_codes)
+
+
 def plot_gender_age(gender_age_df: pd.DataFrame) -> None:
     if gender_age_df.empty:
         return
@@ -117,21 +160,33 @@ def plot_gender_age(gender_age_df: pd.DataFrame) -> None:
     plt.rcParams["axes.unicode_minus"] = False
 
     latest_year = gender_age_df["연도"].max()
-    excluded_groups = {"합계", "15~64세", "65세이상"}
-    latest_df = gender_age_df[
-        (~gender_age_df["연령별"].isin(excluded_groups))
-        & (gender_age_df["연도"] == latest_year)
-    ].copy()
+    age_codes = gender_age_df["연령별"].cat.codes.to_numpy()
+    year_mask = gender_age_df["연도"].to_numpy() == latest_year
+    not_excluded = _not_excluded_age_mask(gender_age_df["연령별"])
+    # Missing ages have code -1 and would otherwise land in the last row.
+    mask = year_mask & not_excluded & (age_codes >= 0)
 
-    if latest_df.empty:
+    if not mask.any():
         return
 
-    age_order = [
-        age
-        for age in latest_df["연령별"].cat.categories
-        if age not in excluded_groups
-    ]
-    pivot = latest_df.pivot(index="연령별", columns="성별", values="값").reindex(age_order)
+    categories = gender_age_df["연령별"].cat.categories
+    age_order = [age for age in categories if age not in EXCLUDED_AGE_GROUPS]
+    # Map each category code to its row in the plotted age axis.
+    row_of_code = np.full(len(categories), -1, dtype=np.int64)
+    row_of_code[categories.get_indexer(age_order)] = np.arange(len(age_order))
+
+    age_rows = row_of_code[age_codes[mask]]
+    genders, gender_cols = np.unique(
+        gender_age_df["성별"].to_numpy()[mask], return_inverse=True
+    )
+    values = np.full((len(age_order), len(genders)), np.nan)
+    values[age_rows, gender_cols] = gender_age_df["값"].to_numpy()[mask]
+
+    pivot = pd.DataFrame(
+        values,
+        index=pd.Index(age_order, name="연령별"),
+        columns=pd.Index(genders, name="성별"),
+    )
     pivot.plot(marker="o")
 
     plt.title(f"{latest_year}년 남자·여자 연령별 일반가구원")
@@ -157,42 +212,32 @@ def build_report(
     )
 
     latest_age_total = age_totals_df[age_totals_df["연도"] == latest_year]
-    main_groups = latest_age_total[
-        ~latest_age_total["연령별"].isin(["합계", "15~64세", "65세이상"])
-    ]
+    age_values = latest_age_total.set_index("연령별")["값"]
+    main_groups = age_values[_not_excluded_age_mask(latest_age_total["연령별"])]
 
-    total_households = latest_age_total.loc[latest_age_total["연령별"] == "합계", "값"].iloc[0]
-    senior_households = latest_age_total.loc[latest_age_total["연령별"] == "65세이상", "값"].iloc[0]
+    total_households = age_values.at["합계"]
+    senior_households = age_values.at["65세이상"]
     senior_ratio = senior_households / total_households * 100
 
-    top_age_row = main_groups.sort_values("값", ascending=False).iloc[0]
-    bottom_age_row = main_groups.sort_values("값", ascending=True).iloc[0]
-
-    male_top_age = (
-        gender_age_df[
-            (gender_age_df["연도"] == latest_year)
-            & (gender_age_df["성별"] == "남자")
-            & (~gender_age_df["연령별"].isin(["합계", "15~64세", "65세이상"]))
-        ]
-        .sort_values("값", ascending=False)
-        .iloc[0]
-    )
-    female_top_age = (
-        gender_age_df[
-            (gender_age_df["연도"] == latest_year)
-            & (gender_age_df["성별"] == "여자")
-            & (~gender_age_df["연령별"].isin(["합계", "15~64세", "65세이상"]))
-        ]
-        .sort_values("값", ascending=False)
-        .iloc[0]
+    top_age = main_groups.idxmax()
+    bottom_age = main_groups.idxmin()
+
+    year_mask = gender_age_df["연도"].to_numpy() == latest_year
+    not_excluded = _not_excluded_age_mask(gender_age_df["연령별"])
+    gender_age_values = (
+        gender_age_df.iloc[year_mask & not_excluded].set_index(["성별", "연령별"])["값"]
     )
+    male_ages = gender_age_values.xs("남자")
+    female_ages = gender_age_values.xs("여자")
+    male_top_age = male_ages.idxmax()
+    female_top_age = female_ages.idxmax()
 
     report = f"""
     {latest_year}년 일반가구원 통계 요약
 
     - 전체 일반가구원은 {total_households:,.0f}명이며, 남자 {latest_gender.get('남자', 0):,.0f}명, 여자 {latest_gender.get('여자', 0):,.0f}명으로 여성이 약간 더 많습니다.
-    - 연령대별로는 '{top_age_row['연령별']}' 구간의 일반가구원이 {top_age_row['값']:,.0f}명으로 가장 많고, '{bottom_age_row['연령별']}' 구간이 {bottom_age_row['값']:,.0f}명으로 가장 적습니다.
-    - 남자는 '{male_top_age['연령별']}' 구간에서 {male_top_age['값']:,.0f}명으로 가장 많으며, 여자는 '{female_top_age['연령별']}' 구간에서 {female_top_age['값']:,.0f}명으로 정점을 이룹니다.
+    - 연령대별로는 '{top_age}' 구간의 일반가구원이 {main_groups.at[top_age]:,.0f}명으로 가장 많고, '{bottom_age}' 구간이 {main_groups.at[bottom_age]:,.0f}명으로 가장 적습니다.
+    - 남자는 '{male_top_age}' 구간에서 {male_ages.at[male_top_age]:,.0f}명으로 가장 많으며, 여자는 '{female_top_age}' 구간에서 {female_ages.at[female_top_age]:,.0f}명으로 정점을 이룹니다.
     - 65세 이상 일반가구원은 {senior_households:,.0f}명으로 전체의 {senior_ratio:.1f}%를 차지하여 고령 가구원의 비중이 상당합니다.
 
     위 지표를 바탕으로 보면 50대 전후 연령층이 일반가구원의 핵심을 이루고 있으며, 고령층 비중이 꾸준히 높아진다는 점에서 향후 고령 친화 정책과 중장년층 지원 전략이 중요해 보입니다.
@@ -204,26 +249,28 @@ def main() -> None:
     long_df = load_long_form_dataframe(DATA_PATH)
     gender_year_df, age_totals_df, gender_age_df = aggregate_general_households(long_df)
 
-    save_csv(gender_year_df, OUTPUT_YEAR_GENDER_CSV)
-    save_csv(age_totals_df, OUTPUT_AGE_CSV)
-    save_csv(gender_age_df, OUTPUT_GENDER_AGE_CSV)
-
-    plot_gender_age(gender_age_df)
+    csv_outputs = [
+        (gender_year_df, OUTPUT_YEAR_GENDER_CSV),
+        (age_totals_df, OUTPUT_AGE_CSV),
+        (gender_age_df, OUTPUT_GENDER_AGE_CSV),
+    ]
+    with ThreadPoolExecutor(max_workers=len(csv_outputs)) as executor:
+        futures = [executor.submit(save_csv, df, path) for df, path in csv_outputs]
+        # pyplot is not thread-safe, so the figure is drawn here while the CSVs are written.
+        plot_gender_age(gender_age_df)
+        for future in futures:
+            future.result()
 
     report_text = build_report(gender_year_df, age_totals_df, gender_age_df)
     OUTPUT_REPORT.write_text(report_text, encoding="utf-8")
 
     print("연도별 남자/여자 일반가구원")
-    print(gender_year_df.to_string(index=False))
+    print(format_table(gender_year_df))
     print("\n연령별 일반가구원(계)")
-    age_view = (
-        age_totals_df[age_totals_df["연령별"].notna()]
-        .sort_values(["연도", "연령별"])
-        .to_string(index=False)
-    )
-    print(age_view)
+    age_view = age_totals_df[age_totals_df["연령별"].notna()].sort_values(["연도", "연령별"])
+    print(format_table(age_view))
     print("\n남자·여자 연령별 일반가구원")
-    print(gender_age_df.to_string(index=False))
+    print(format_table(gender_age_df))
     print(f"\n리포트 저장: {OUTPUT_REPORT.name}")
     if OUTPUT_FIGURE.exists():
         print(f"그래프 저장: {OUTPUT_FIGURE.name}")